@@ -1,40 +1,183 @@
 # -*- coding: utf-8 -*-
+import html
+import importlib.util
+import json
 import math
 import os
+import re
+import tempfile
+import threading
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from urllib.parse import quote
 import time # 시간 로깅을 위해 추가
 
 import pandas as pd
 import requests
-from flask import Flask, jsonify, request
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, jsonify, request, stream_with_context
 
 app = Flask(__name__)
 
+# Graph API 주소 (부하 테스트 시 로컬 모의 서버로 교체: benchmarks/load_test.py)
+GRAPH_API_BASE_URL = os.environ.get("GRAPH_API_BASE_URL", "https://graph.facebook.com").rstrip('/')
+
 # --- 계정 설정 로드 ---
+# 계정 레지스트리: 환경 변수(ACCOUNT_CONFIG_{i}_*)와 레지스트리 JSON 파일(ACCOUNT_REGISTRY_PATH)을 합쳐 사용합니다.
+# 파일이 바뀌면(mtime 변경) 다음 요청에서 다시 읽으므로 계정 추가 시 재배포가 필요 없습니다. 같은 이름이면 파일 설정이 우선합니다.
+#
+# 레지스트리 파일 형식 (accounts.example.json 참고):
+#   {"accounts": [{"name": "...", "id": "act_...", "token": "...", "token_expires_at": "2026-12-31",
+#                  "api_version": "v19.0", "currency": "KRW", "max_workers": 15}]}
+DEFAULT_API_VERSION = "v19.0"
+DEFAULT_CURRENCY = "KRW"
+DEFAULT_MAX_WORKERS = 15 # 계정별 크리에이티브 동시 요청 수 / 커넥션 풀 크기
+MAX_WORKERS_LIMIT = 64
+ACCOUNT_REGISTRY_PATH = os.environ.get(
+    "ACCOUNT_REGISTRY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "accounts.json")
+)
+ACCOUNT_ENV_PATTERN = re.compile(r"^ACCOUNT_CONFIG_(\d+)_NAME$")
+DATE_ONLY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def parse_token_expiry(value):
+    # 'YYYY-MM-DD'(그날 23:59:59 까지 유효), ISO datetime 문자열 또는 유닉스 타임스탬프를 datetime 으로 변환 (없거나 잘못되면 None)
+    # 시간대가 있는 값은 서버 로컬 시간으로 바꾼 뒤 tzinfo 를 떼어, datetime.now() 와 비교할 수 있는 naive 값으로 통일합니다.
+    if value in (None, ''):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value)
+        text = str(value).strip()
+        if DATE_ONLY_PATTERN.match(text): # 날짜만 있으면 그날 끝까지 유효
+            return datetime.fromisoformat(text).replace(hour=23, minute=59, second=59, microsecond=999999)
+        expires_at = datetime.fromisoformat(text.replace('Z', '+00:00').replace(' ', 'T'))
+        if expires_at.tzinfo is not None:
+            expires_at = expires_at.astimezone().replace(tzinfo=None)
+        return expires_at
+    except (ValueError, TypeError, OverflowError, OSError):
+        print(f"Warning: Could not parse token expiry '{value}'. Ignoring.")
+        return None
+
+
+def make_account_config(name, account_id, token, token_expires_at=None, api_version=None, currency=None, max_workers=None):
+    try:
+        max_workers = int(max_workers) if max_workers not in (None, '') else DEFAULT_MAX_WORKERS
+    except (ValueError, TypeError):
+        print(f"Warning: Invalid max_workers '{max_workers}' for account '{name}'. Using {DEFAULT_MAX_WORKERS}.")
+        max_workers = DEFAULT_MAX_WORKERS
+    return {
+        "id": account_id,
+        "token": token,
+        "name": name,
+        "token_expires_at": parse_token_expiry(token_expires_at),
+        "api_version": api_version or DEFAULT_API_VERSION,
+        "currency": (currency or DEFAULT_CURRENCY).upper(),
+        "max_workers": min(max(max_workers, 1), MAX_WORKERS_LIMIT),
+    }
+
+
 def load_account_configs():
+    # ACCOUNT_CONFIG_{i}_NAME/ID/TOKEN (+ 선택: _TOKEN_EXPIRES_AT, _API_VERSION, _CURRENCY, _MAX_WORKERS)
+    # 번호가 중간에 비어 있어도 모든 번호를 읽습니다.
     accounts = {}
-    i = 1
-    while True:
-        name_key = f"ACCOUNT_CONFIG_{i}_NAME"
-        id_key = f"ACCOUNT_CONFIG_{i}_ID"
-        token_key = f"ACCOUNT_CONFIG_{i}_TOKEN"
-
-        name = os.environ.get(name_key)
-        account_id = os.environ.get(id_key)
-        token = os.environ.get(token_key)
+    indices = sorted(int(m.group(1)) for m in map(ACCOUNT_ENV_PATTERN.match, os.environ) if m)
+    for i in indices:
+        prefix = f"ACCOUNT_CONFIG_{i}_"
+        name = os.environ.get(prefix + "NAME")
+        account_id = os.environ.get(prefix + "ID")
+        token = os.environ.get(prefix + "TOKEN")
 
         if name and account_id and token:
-            accounts[name] = {"id": account_id, "token": token, "name": name}
-            i += 1
+            accounts[name] = make_account_config(
+                name, account_id, token,
+                token_expires_at=os.environ.get(prefix + "TOKEN_EXPIRES_AT"),
+                api_version=os.environ.get(prefix + "API_VERSION"),
+                currency=os.environ.get(prefix + "CURRENCY"),
+                max_workers=os.environ.get(prefix + "MAX_WORKERS"),
+            )
         else:
-            break
-    if not accounts:
-        print("Warning: No account configurations found in environment variables (e.g., ACCOUNT_CONFIG_1_NAME/ID/TOKEN).")
+            print(f"Warning: Incomplete account configuration for ACCOUNT_CONFIG_{i}_* (NAME/ID/TOKEN required). Skipping.")
+    return accounts
+
+
+def load_account_registry_file(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data.get('accounts', []) if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        raise ValueError("'accounts' must be a list of account objects")
+    accounts = {}
+    for entry in entries:
+        name, account_id, token = entry.get('name'), entry.get('id'), entry.get('token')
+        if not (name and account_id and token):
+            print(f"Warning: Skipping incomplete account entry in {path}: {name or '(no name)'}")
+            continue
+        accounts[name] = make_account_config(
+            name, account_id, token,
+            token_expires_at=entry.get('token_expires_at'),
+            api_version=entry.get('api_version'),
+            currency=entry.get('currency'),
+            max_workers=entry.get('max_workers'),
+        )
     return accounts
 
-ACCOUNT_CONFIGS = load_account_configs()
+
+_env_account_configs = load_account_configs()
+_account_registry = {"mtime": None, "accounts": dict(_env_account_configs)}
+_account_registry_lock = threading.Lock()
+
+
+def get_account_configs():
+    """현재 계정 설정을 반환합니다. 레지스트리 파일이 바뀌었으면 다시 읽습니다."""
+    try:
+        mtime = os.stat(ACCOUNT_REGISTRY_PATH).st_mtime
+    except OSError:
+        mtime = None # 파일 없음 -> 환경 변수 설정만 사용
+
+    if mtime != _account_registry["mtime"]:
+        with _account_registry_lock:
+            if mtime != _account_registry["mtime"]:
+                accounts = dict(_env_account_configs)
+                try:
+                    if mtime is not None:
+                        accounts.update(load_account_registry_file(ACCOUNT_REGISTRY_PATH))
+                        print(f"Loaded account registry from {ACCOUNT_REGISTRY_PATH} ({len(accounts)} accounts).")
+                    _account_registry["accounts"] = accounts
+                    if not accounts:
+                        print("Warning: No account configurations found (ACCOUNT_REGISTRY_PATH file or ACCOUNT_CONFIG_1_NAME/ID/TOKEN environment variables).")
+                except (OSError, ValueError, TypeError, AttributeError) as e:
+                    # 잘못된 파일이면 이전 설정을 유지 (mtime 은 갱신하여 같은 오류를 반복 출력하지 않음)
+                    print(f"Error loading account registry {ACCOUNT_REGISTRY_PATH}: {e}. Keeping previous account configuration.")
+                _account_registry["mtime"] = mtime
+
+    return _account_registry["accounts"]
+
+
+def is_token_expired(account_config):
+    expires_at = account_config.get('token_expires_at')
+    return expires_at is not None and expires_at <= datetime.now()
+
+
+# 계정별 HTTP 세션: max_workers 만큼 커넥션 풀을 잡아 동시 요청이 많은 계정도 연결을 재사용합니다.
+_account_sessions = {}
+_account_sessions_lock = threading.Lock()
+
+
+def get_account_session(account_config):
+    session_key = (account_config['id'], account_config['max_workers'])
+    with _account_sessions_lock:
+        session = _account_sessions.get(session_key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=account_config['max_workers'])
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _account_sessions[session_key] = session
+    return session
+
 
 @app.after_request
 def after_request(response):
@@ -45,7 +188,10 @@ def after_request(response):
 
 @app.route('/api', methods=['GET'])
 def home():
-    return jsonify({"message": "Facebook 광고 성과 보고서 API가 실행 중입니다."})
+    return jsonify({
+        "message": "Facebook 광고 성과 보고서 API가 실행 중입니다.",
+        "export_formats": available_export_formats(),
+    })
 
 @app.route('/api/accounts', methods=['POST'])
 def get_accounts():
@@ -56,12 +202,57 @@ def get_accounts():
         password = data.get('password')
         if not password or password != os.environ.get("REPORT_PASSWORD"):
             return jsonify({"error": "비밀번호가 올바르지 않습니다."}), 403
-        account_names = list(ACCOUNT_CONFIGS.keys())
+        account_names = list(get_account_configs().keys())
         return jsonify(account_names)
     except Exception as e:
         print(f"Error getting account list: {e}")
         return jsonify({"error": "Failed to retrieve account list."}), 500
 
+def parse_report_request(data):
+    """보고서 요청 본문을 검증하여 (report_args, None) 또는 (None, 오류 응답)을 반환합니다."""
+    password = data.get('password')
+    if not password or password != os.environ.get("REPORT_PASSWORD"):
+        return None, (jsonify({"error": "비밀번호가 올바르지 않습니다."}), 403)
+
+    today = datetime.today()
+    default_date = (today - timedelta(days=1)).strftime('%Y-%m-%d')
+    start_date = data.get('start_date') or default_date
+    end_date = data.get('end_date') or default_date
+
+    account_configs = get_account_configs()
+    selected_account_key = data.get('selected_account_key')
+    if not selected_account_key:
+        if len(account_configs) == 1:
+            selected_account_key = list(account_configs.keys())[0]
+        else:
+            return None, (jsonify({"error": "요청에 'selected_account_key'가 필요합니다. (사용 가능한 계정: " + ", ".join(account_configs.keys()) + ")"}), 400)
+
+    account_config = account_configs.get(selected_account_key)
+    if not account_config:
+        return None, (jsonify({"error": f"선택한 계정 키 '{selected_account_key}'에 대한 설정을 찾을 수 없습니다. 사용 가능한 계정: " + ", ".join(account_configs.keys())}), 404)
+
+    account = account_config.get('id')
+    token = account_config.get('token')
+    if not account or not token:
+        print(f"Error: Missing ID or Token for account key '{selected_account_key}' in server configuration.")
+        return None, (jsonify({"error": "Server configuration error: Incomplete account credentials."}), 500)
+    if is_token_expired(account_config):
+        print(f"Error: Access token for account key '{selected_account_key}' expired at {account_config['token_expires_at']}.")
+        return None, (jsonify({"error": f"'{selected_account_key}' 계정의 액세스 토큰이 만료되었습니다. 관리자에게 문의하세요."}), 403)
+
+    report_args = {
+        'account_key': selected_account_key,
+        'start_date': start_date,
+        'end_date': end_date,
+        'ver': account_config['api_version'],
+        'account': account,
+        'token': token,
+        'currency': account_config['currency'],
+        'max_workers': account_config['max_workers'],
+        'session': get_account_session(account_config),
+    }
+    return report_args, None
+
 @app.route('/api/generate-report', methods=['POST'])
 def generate_report():
     if request.method == 'OPTIONS':
@@ -69,35 +260,19 @@ def generate_report():
     try:
         start_time_total = time.time() # 전체 요청 처리 시간 측정 시작
         data = request.get_json()
-        password = data.get('password')
-        if not password or password != os.environ.get("REPORT_PASSWORD"):
-            return jsonify({"error": "비밀번호가 올바르지 않습니다."}), 403
-
-        today = datetime.today()
-        default_date = (today - timedelta(days=1)).strftime('%Y-%m-%d')
-        start_date = data.get('start_date') or default_date
-        end_date = data.get('end_date') or default_date
-
-        selected_account_key = data.get('selected_account_key')
-        if not selected_account_key:
-            if len(ACCOUNT_CONFIGS) == 1:
-                selected_account_key = list(ACCOUNT_CONFIGS.keys())[0]
-            else:
-                return jsonify({"error": "요청에 'selected_account_key'가 필요합니다. (사용 가능한 계정: " + ", ".join(ACCOUNT_CONFIGS.keys()) + ")"}), 400
-
-        account_config = ACCOUNT_CONFIGS.get(selected_account_key)
-        if not account_config:
-            return jsonify({"error": f"선택한 계정 키 '{selected_account_key}'에 대한 설정을 찾을 수 없습니다. 사용 가능한 계정: " + ", ".join(ACCOUNT_CONFIGS.keys())}), 404
-
-        account = account_config.get('id')
-        token = account_config.get('token')
-        if not account or not token:
-            print(f"Error: Missing ID or Token for account key '{selected_account_key}' in server configuration.")
-            return jsonify({"error": "Server configuration error: Incomplete account credentials."}), 500
-
-        ver = "v19.0"
-
-        result = fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token)
+        report_args, error_response = parse_report_request(data)
+        if error_response:
+            return error_response
+
+        render_mode = data.get('render') or RENDER_MODE_HTML
+        if render_mode not in RENDER_MODES:
+            return jsonify({"error": f"지원하지 않는 렌더링 모드입니다: '{render_mode}' (사용 가능: " + ", ".join(RENDER_MODES) + ")"}), 400
+
+        result = fetch_and_format_facebook_ads_data(
+            report_args['start_date'], report_args['end_date'], report_args['ver'],
+            report_args['account'], report_args['token'], render_mode=render_mode,
+            currency=report_args['currency'], max_workers=report_args['max_workers'], session=report_args['session']
+        )
         
         end_time_total = time.time()
         print(f"[Performance] Total report generation time: {end_time_total - start_time_total:.2f} seconds")
@@ -114,8 +289,54 @@ def generate_report():
         print(f"An unexpected error occurred: {str(e)}\nDetails:\n{error_details}")
         return jsonify({"error": "An internal server error occurred while generating the report."}), 500
 
+@app.route('/api/export/<export_format>', methods=['POST'])
+def export_report(export_format):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        start_time_total = time.time()
+        exporter = REPORT_EXPORTERS.get(export_format)
+        if not exporter:
+            return jsonify({"error": f"지원하지 않는 내보내기 형식입니다: '{export_format}' (사용 가능: " + ", ".join(REPORT_EXPORTERS.keys()) + ")"}), 400
+
+        data = request.get_json()
+        report_args, error_response = parse_report_request(data)
+        if error_response:
+            return error_response
+
+        df_sorted = get_report_frame(
+            report_args['start_date'], report_args['end_date'], report_args['ver'],
+            report_args['account'], report_args['token'],
+            max_workers=report_args['max_workers'], session=report_args['session'], currency=report_args['currency']
+        )
+        if df_sorted is None:
+            return jsonify({"error": "선택한 기간 및 계정에 대한 데이터가 없습니다."}), 404
+
+        export_df = build_export_frame(df_sorted)
+        mimetype, chunks = exporter(export_df) # 선택적 의존성이 없으면 여기서 ImportError
+        filename = f"fb_ads_{report_args['account_key']}_{report_args['start_date']}_{report_args['end_date']}.{export_format}"
+
+        end_time_total = time.time()
+        print(f"[Performance] Export ({export_format}, {len(export_df)} rows) prepared in {end_time_total - start_time_total:.2f} seconds. Streaming response.")
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=\"fb_ads_report.{export_format}\"; filename*=UTF-8''{quote(filename)}"}
+        )
+
+    except ImportError as import_err:
+        print(f"Export format '{export_format}' is unavailable: {import_err}")
+        return jsonify({"error": f"서버에 '{export_format}' 내보내기에 필요한 패키지가 설치되어 있지 않습니다."}), 501
+    except requests.exceptions.RequestException as req_err:
+        print(f"Error during Facebook API request: {str(req_err)}")
+        return jsonify({"error": f"API request failed: {str(req_err)}"}), 500
+    except Exception as e:
+        error_details = traceback.format_exc()
+        print(f"An unexpected error occurred during export: {str(e)}\nDetails:\n{error_details}")
+        return jsonify({"error": "An internal server error occurred while exporting the report."}), 500
+
 # --- 크리에이티브 및 미디어 식별 함수 ---
-def get_creative_details(ad_id, ver, token): #
+def get_creative_details(ad_id, ver, token, session=requests): #
     creative_details = {
         'content_type': '알 수 없음',
         'display_url': '',
@@ -128,15 +349,15 @@ def get_creative_details(ad_id, ver, token): #
         # 다만, 현재 코드는 creative ID를 얻은 후 해당 ID로 상세 정보를 요청하는 방식입니다.
         # 이 구조를 유지한다면, 요청 필드를 최소화하는 것이 중요합니다.
 
-        creative_req_url = f"https://graph.facebook.com/{ver}/{ad_id}"
+        creative_req_url = f"{GRAPH_API_BASE_URL}/{ver}/{ad_id}"
         creative_params = {'fields': 'creative{id}', 'access_token': token} # creative ID만 요청
-        creative_response = requests.get(url=creative_req_url, params=creative_params)
+        creative_response = session.get(url=creative_req_url, params=creative_params)
         creative_response.raise_for_status()
         creative_data = creative_response.json()
         creative_id = creative_data.get('creative', {}).get('id')
 
         if creative_id:
-            details_req_url = f"https://graph.facebook.com/{ver}/{creative_id}"
+            details_req_url = f"{GRAPH_API_BASE_URL}/{ver}/{creative_id}"
             # 필요한 필드만 명시적으로 요청합니다.
             # 현재 코드에서 사용되는 필드: object_type, image_url, thumbnail_url, video_id, 
             # effective_object_story_id, object_story_spec, instagram_permalink_url,
@@ -144,20 +365,20 @@ def get_creative_details(ad_id, ver, token): #
             # 이 필드들이 모두 사용되는지 확인하고, 사용되지 않는 필드는 제거합니다.
             fields = 'object_type,image_url,thumbnail_url,video_id,effective_object_story_id,object_story_spec{link_data,video_data},instagram_permalink_url,asset_feed_spec{videos,images},effective_instagram_media_id'
             details_params = {'fields': fields, 'access_token': token}
-            details_response = requests.get(url=details_req_url, params=details_params)
+            details_response = session.get(url=details_req_url, params=details_params)
             details_response.raise_for_status()
             details_data = details_response.json()
 
             # --- Instagram media_id 우선 처리 ---
             effective_instagram_media_id = details_data.get('effective_instagram_media_id')
             if effective_instagram_media_id:
-                ig_api_url = f"https://graph.facebook.com/v22.0/{effective_instagram_media_id}" # API 버전을 최신으로 유지하거나 프로젝트 버전에 맞춤
+                ig_api_url = f"{GRAPH_API_BASE_URL}/v22.0/{effective_instagram_media_id}" # API 버전을 최신으로 유지하거나 프로젝트 버전에 맞춤
                 # 여기도 필요한 필드만 요청합니다: media_url, media_type, permalink, thumbnail_url
                 ig_params = {
                     'fields': 'media_url,media_type,permalink,thumbnail_url',
                     'access_token': token
                 }
-                ig_resp = requests.get(ig_api_url, params=ig_params)
+                ig_resp = session.get(ig_api_url, params=ig_params)
                 ig_resp.raise_for_status()
                 ig_data = ig_resp.json()
                 media_url = ig_data.get('media_url')
@@ -206,7 +427,7 @@ def get_creative_details(ad_id, ver, token): #
                 creative_details['content_type'] = '동영상'
                 creative_details['display_url'] = thumbnail_url or feed_thumbnail_url or image_url or ""
                 if actual_video_id:
-                    video_source_url = get_video_source_url(actual_video_id, ver, token)
+                    video_source_url = get_video_source_url(actual_video_id, ver, token, session)
                     creative_details['target_url'] = video_source_url if video_source_url else (f"https://www.facebook.com/watch/?v={actual_video_id}" if actual_video_id else creative_details['display_url'])
                 else:
                     creative_details['target_url'] = creative_details['display_url']
@@ -221,14 +442,14 @@ def get_creative_details(ad_id, ver, token): #
                     creative_details['content_type'] = '동영상'
                     creative_details['display_url'] = feed_thumbnail_url or thumbnail_url or ""
                     if feed_video_id:
-                        video_source_url = get_video_source_url(feed_video_id, ver, token)
+                        video_source_url = get_video_source_url(feed_video_id, ver, token, session)
                         creative_details['target_url'] = video_source_url if video_source_url else f"https://www.facebook.com/watch/?v={feed_video_id}"
                     else:
                         creative_details['target_url'] = creative_details['display_url']
                 elif link_data and oss_video_id: # 그 다음 object_story_spec.link_data.video_id
                     creative_details['content_type'] = '동영상'
                     creative_details['display_url'] = thumbnail_url or feed_thumbnail_url or image_url or oss_image_url or ""
-                    video_source_url = get_video_source_url(oss_video_id, ver, token)
+                    video_source_url = get_video_source_url(oss_video_id, ver, token, session)
                     creative_details['target_url'] = video_source_url if video_source_url else f"https://www.facebook.com/watch/?v={oss_video_id}"
                 elif link_data and (link_data.get('image_hash') or oss_image_url): # 그 다음 object_story_spec.link_data 이미지
                     creative_details['content_type'] = '사진'
@@ -265,11 +486,11 @@ def get_creative_details(ad_id, ver, token): #
     return creative_details
 
 
-def get_video_source_url(video_id, ver, token): #
+def get_video_source_url(video_id, ver, token, session=requests): #
     try:
-        video_req_url = f"https://graph.facebook.com/{ver}/{video_id}"
+        video_req_url = f"{GRAPH_API_BASE_URL}/{ver}/{video_id}"
         video_params = {'fields': 'source', 'access_token': token} # 'source' 필드만 요청
-        video_response = requests.get(url=video_req_url, params=video_params)
+        video_response = session.get(url=video_req_url, params=video_params)
         video_response.raise_for_status()
         video_data = video_response.json()
         return video_data.get('source')
@@ -277,12 +498,12 @@ def get_video_source_url(video_id, ver, token): #
         print(f"Notice: Could not fetch video source for video {video_id}. Might lack permissions or video is private. Error: {e}")
         return None
 
-def fetch_creatives_parallel(ad_ids_with_spend, ver, token, max_workers=10): #
+def fetch_creatives_parallel(ad_ids_with_spend, ver, token, max_workers=10, session=requests): #
     # ad_ids_with_spend: 지출이 있는 광고 ID 리스트를 받도록 수정
     creatives_data = {}
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 지출이 있는 ad_id에 대해서만 크리에이티브 정보 요청
-        futures = {executor.submit(get_creative_details, ad_id, ver, token): ad_id for ad_id in ad_ids_with_spend}
+        futures = {executor.submit(get_creative_details, ad_id, ver, token, session): ad_id for ad_id in ad_ids_with_spend}
         for future in as_completed(futures):
             ad_id = futures[future]
             try:
@@ -294,8 +515,183 @@ def fetch_creatives_parallel(ad_ids_with_spend, ver, token, max_workers=10): #
     return creatives_data
 
 
-def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token): #
+# --- 보고서 렌더러 ---
+# 렌더링 모드: 'html'은 서버에서 테이블 HTML을 생성하고, 'data'는 데이터만 보내 클라이언트(script.js)에서 렌더링합니다.
+RENDER_MODE_HTML = 'html'
+RENDER_MODE_DATA = 'data'
+RENDER_MODES = (RENDER_MODE_HTML, RENDER_MODE_DATA)
+
+# 스타일은 style.css 에서 관리합니다. (응답마다 <style> 블록을 보내지 않음)
+HTML_TABLE_HEADER = (
+    '<tr>'
+    '<th>캠페인명</th><th>광고세트명</th><th>소재명</th><th>FB 광고비용</th>'
+    '<th>노출</th><th>Click</th><th>CTR</th><th>CPC</th><th>CVR</th>'
+    '<th>구매 수</th><th>구매당 비용</th><th>광고 성과</th><th>콘텐츠 유형</th><th>광고 콘텐츠</th>'
+    '</tr>'
+)
+# 행 템플릿은 모듈 로드 시 한 번만 만들어 두고, 컬럼 배열을 zip 하여 일괄 렌더링합니다.
+# 자리 표시자 순서: row_class, 캠페인명, 광고세트명, 소재명, FB 광고비용, 노출, Click, CTR, CPC, CVR,
+#                 구매 수, 구매당 비용, performance_class, 광고 성과, 콘텐츠 유형, 광고 콘텐츠
+HTML_ROW_TEMPLATE = (
+    '<tr class="{0}">'
+    '<td>{1}</td><td>{2}</td><td>{3}</td>'
+    '<td>{4}</td><td>{5}</td>'
+    '<td>{6}</td><td>{7}</td>'
+    '<td>{8}</td><td>{9}</td>'
+    '<td>{10}</td><td>{11}</td>'
+    '<td class="{12}">{13}</td>'
+    '<td>{14}</td><td class="ad-content-cell">{15}</td>'
+    '</tr>'
+).format
+HTML_IMG_TEMPLATE = '<img src="{0}" class="ad-content-thumbnail" alt="광고 콘텐츠">'.format
+HTML_LINK_TEMPLATE = '<a href="{0}" target="_blank" rel="noopener noreferrer">{1}</a>'.format
+
+# 통화 코드별 금액 표시 형식: 기호, 소수 자릿수, 기호를 숫자 앞에 붙일지 여부
+# 목록에 없는 통화는 ZERO_DECIMAL_CURRENCIES 에 있으면 소수 0자리, 아니면 2자리로 하고 통화 코드를 숫자 뒤에 붙입니다.
+CURRENCY_FORMATS = {
+    'KRW': {'symbol': '₩', 'decimals': 0, 'prefix': False},
+    'JPY': {'symbol': '¥', 'decimals': 0, 'prefix': True},
+    'USD': {'symbol': '$', 'decimals': 2, 'prefix': True},
+    'EUR': {'symbol': '€', 'decimals': 2, 'prefix': True},
+}
+ZERO_DECIMAL_CURRENCIES = {'KRW', 'JPY', 'VND', 'CLP', 'ISK', 'PYG'}
+# 통화별 '개선 필요!' 기준 구매당 비용 (이 금액 이상이면 개선 필요, 미만인 광고 중에서 상위 3개 선정)
+# 목록에 없는 통화는 기준 없음: '개선 필요!' 표시 없이 구매당 비용이 있는 모든 광고에서 상위 3개 선정
+POOR_COST_PER_PURCHASE = {
+    'KRW': 100000,
+    'JPY': 10000,
+    'USD': 75,
+    'EUR': 70,
+}
+
+
+def get_currency_format(currency):
+    currency = currency or DEFAULT_CURRENCY
+    if currency in CURRENCY_FORMATS:
+        return CURRENCY_FORMATS[currency]
+    return {'symbol': currency, 'decimals': 0 if currency in ZERO_DECIMAL_CURRENCIES else 2, 'prefix': False}
+
+
+def get_poor_cost_per_purchase(currency):
+    return POOR_COST_PER_PURCHASE.get(currency or DEFAULT_CURRENCY, float('inf'))
+
+
+def round_amount(value, decimals):
+    # 소수 0자리 통화는 int, 그 외는 소수 자릿수만큼 반올림한 float
+    return round(value) if decimals == 0 else round(value, decimals)
+
+
+def round_amount_series(series, decimals):
+    series = series.round(decimals)
+    return series.astype(int) if decimals == 0 else series
+
+PERFORMANCE_CLASSES = {
+    '위닝 콘텐츠': 'winning-content',
+    '고성과 콘텐츠': 'medium-performance',
+    '성과 콘텐츠': 'third-performance',
+    '개선 필요!': 'needs-improvement',
+}
+
+
+def _column_values(df, col, default=''):
+    # 컬럼이 없으면 기본값으로 채운 리스트 반환
+    if col in df.columns:
+        return df[col].tolist()
+    return [default] * len(df)
+
+
+def _escape_column(values):
+    # None/NaN 은 빈 문자열로, 그 외 값은 HTML 이스케이프
+    return [html.escape(str(v)) if v is not None and v == v else '' for v in values]
+
+
+def _format_number_column(values, suffix=''):
+    # 숫자가 아니거나 NaN/inf 인 값은 0으로 표시 (기존 format_currency/format_number 와 동일한 규칙)
+    nums = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    nums = nums.where(nums.abs() != float('inf'))
+    return [f"{int(v):,}{suffix}" if v == v else f"0{suffix}" for v in nums.tolist()]
+
+
+def _format_amount_column(values, currency):
+    # 통화 금액 표시 (KRW: '1,296 ₩', USD: '$1,296.45'). 숫자가 아니거나 NaN/inf 인 값은 0
+    currency_format = get_currency_format(currency)
+    decimals = currency_format['decimals']
+    symbol = html.escape(currency_format['symbol'])
+    nums = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    nums = nums.where(nums.abs() != float('inf')).fillna(0)
+    if decimals == 0:
+        texts = [f"{int(v):,}" for v in nums.tolist()]
+    else:
+        texts = [f"{v:,.{decimals}f}" for v in nums.tolist()]
+    if currency_format['prefix']:
+        return [f"{symbol}{text}" for text in texts]
+    return [f"{text} {symbol}" for text in texts]
+
+
+def _content_cell(display_url, target_url, is_total):
+    if display_url and isinstance(display_url, str):
+        img_tag = HTML_IMG_TEMPLATE(html.escape(display_url))
+        if isinstance(target_url, str) and target_url.startswith('http'):
+            return HTML_LINK_TEMPLATE(html.escape(target_url), img_tag)
+        return img_tag
+    return '' if is_total else '-'
+
+
+def render_html_table(df, currency=DEFAULT_CURRENCY):
+    """보고서 DataFrame을 컬럼 배열 단위로 일괄 렌더링하여 <table> HTML을 반환합니다."""
+    names = _column_values(df, '소재명')
+    is_total = [name == '합계' for name in names]
+    performance = _column_values(df, '광고 성과')
+
+    rows = map(
+        HTML_ROW_TEMPLATE,
+        ['total-row' if t else '' for t in is_total],
+        _escape_column(_column_values(df, '캠페인명')),
+        _escape_column(_column_values(df, '광고세트명')),
+        _escape_column(names),
+        _format_amount_column(_column_values(df, 'FB 광고비용', 0), currency),
+        _format_number_column(_column_values(df, '노출', 0)),
+        _format_number_column(_column_values(df, 'Click', 0)),
+        _escape_column(_column_values(df, 'CTR', '0%')),
+        _format_amount_column(_column_values(df, 'CPC', 0), currency),
+        _escape_column(_column_values(df, 'CVR', '0%')),
+        _format_number_column(_column_values(df, '구매 수', 0)),
+        _format_amount_column(_column_values(df, '구매당 비용', 0), currency),
+        [PERFORMANCE_CLASSES.get(p, '') for p in performance],
+        _escape_column(performance),
+        _escape_column(_column_values(df, '콘텐츠 유형')),
+        list(map(_content_cell, _column_values(df, 'display_url'), _column_values(df, 'target_url'), is_total)),
+    )
+    return f"<table>{HTML_TABLE_HEADER}{''.join(rows)}</table>"
+
+
+def clean_numeric(data): #
+    if isinstance(data, dict): return {k: clean_numeric(v) for k, v in data.items()}
+    elif isinstance(data, list): return [clean_numeric(item) for item in data]
+    elif isinstance(data, (int, float)):
+        if math.isinf(data) or math.isnan(data): return 0 # 또는 None이나 적절한 값
+        return data
+    elif not isinstance(data, (str, bool)) and data is not None: # 추가: data가 None이 아닌 경우만 처리
+        try: 
+            if hasattr(data, 'item'): return data.item() # NumPy type 처리
+        except: pass # 실패 시 문자열로 변환
+        return str(data) # 그 외 타입은 문자열로
+    return data
+
+
+def build_report_records(df, keep_urls=False):
+    """JSON 응답용 레코드 리스트를 만듭니다. keep_urls=False 이면 ad_id, display_url, target_url 제외."""
+    drop_cols = ['ad_id'] if keep_urls else ['ad_id', 'display_url', 'target_url']
+    df_for_json = df.drop(columns=drop_cols, errors='ignore')
+    return clean_numeric(df_for_json.to_dict(orient='records'))
+
+
+def build_report_frame(start_date, end_date, ver, account, token, max_workers=DEFAULT_MAX_WORKERS, session=requests,
+                       currency=DEFAULT_CURRENCY): #
+    """인사이트/크리에이티브를 불러와 광고별 집계 DataFrame(합계 행 포함, 정렬 완료)을 만듭니다. 데이터가 없으면 None."""
     s_time_func = time.time()
+    amount_decimals = get_currency_format(currency)['decimals'] # 금액 반올림 자릿수 (KRW: 0, USD: 2)
+    poor_cost_per_purchase = get_poor_cost_per_purchase(currency) # '개선 필요!' 기준 (KRW: 100,000)
     all_records = []
     # metrics 필드에서 actions 필드는 다양한 하위 유형을 가질 수 있어 응답이 커질 수 있음.
     # 필요한 action_type만 명시적으로 요청하는 것을 고려 (예: 'actions{action_type,value}')
@@ -303,7 +699,7 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
     # (FB API 문서 참조: filtering on subfields)
     # 일단 현재 구조 유지하되, action 처리 부분에서 필요한 action만 추출하도록 함.
     metrics = 'ad_id,ad_name,campaign_name,adset_name,spend,impressions,clicks,ctr,cpc,actions,action_values' # purchase_roas도 고려
-    insights_url = f"https://graph.facebook.com/{ver}/{account}/insights"
+    insights_url = f"{GRAPH_API_BASE_URL}/{ver}/{account}/insights"
     params = {
         'fields': metrics,
         'access_token': token,
@@ -321,7 +717,7 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
         current_url = insights_url if page_count > 1 else insights_url
         current_params = params if page_count == 1 else None # 두 번째 페이지부터는 next url에 파라미터 포함됨
         try:
-            response = requests.get(url=current_url, params=current_params)
+            response = session.get(url=current_url, params=current_params)
             response.raise_for_status()
         except requests.exceptions.RequestException as req_err:
             print(f"페이지 데이터 불러오기 중 네트워크 오류 발생 (Page: {page_count}, URL: {current_url.split('access_token=')[0]}...): {req_err}")
@@ -349,7 +745,7 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
 
     if not all_records:
         print("처리할 데이터가 없습니다.")
-        return {"html_table": "<p>선택한 기간 및 계정에 대한 데이터가 없습니다.</p>", "data": []}
+        return None
 
     s_time_process_records = time.time()
     ad_data = {}
@@ -420,13 +816,13 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
 
     if not ad_data: # 지출이 있는 광고가 없는 경우
         print("데이터 집계 후 처리할 레코드가 없습니다 (지출이 있는 광고 없음).")
-        return {"html_table": "<p>데이터가 없습니다.</p>", "data": []}
+        return None
 
     s_time_fetch_creatives = time.time()
     # fetch_creatives_parallel 함수를 호출하여 ad_data에 creative_details를 직접 추가하는 대신,
     # 별도의 creatives_map을 받고 나중에 DataFrame에 병합하는 방식도 고려 가능.
     # 현재는 ad_data (이제는 DataFrame)를 직접 수정하도록 함.
-    creative_info_map = fetch_creatives_parallel(list(ad_ids_with_spend), ver, token, max_workers=15) # max_workers 수 조절 가능
+    creative_info_map = fetch_creatives_parallel(list(ad_ids_with_spend), ver, token, max_workers=max_workers, session=session) # 계정별 max_workers (레지스트리 설정)
     e_time_fetch_creatives = time.time()
     print(f"[Performance] Fetching creatives for {len(ad_ids_with_spend)} ads took {e_time_fetch_creatives - s_time_fetch_creatives:.2f} seconds.")
 
@@ -435,7 +831,7 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
     result_list = list(ad_data.values()) # ad_data 딕셔너리에서 값들을 리스트로 변환
     if not result_list:
         print("데이터 집계 후 처리할 레코드가 없습니다.")
-        return {"html_table": "<p>데이터가 없습니다.</p>", "data": []}
+        return None
 
     df = pd.DataFrame(result_list)
     
@@ -451,7 +847,7 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
     for col in numeric_cols:
         if col in df.columns:
             if col == 'spend':
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round(0).astype(int)
+                df[col] = round_amount_series(pd.to_numeric(df[col], errors='coerce').fillna(0), amount_decimals)
             else:
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
         else:
@@ -478,17 +874,17 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
     df.loc[df['impressions'] > 0, 'CTR_val'] = (df['link_clicks'] / df['impressions'] * 100)
     df['CTR'] = df['CTR_val'].round(2).astype(str) + '%'
     
-    df['CPC_val'] = 0
+    df['CPC_val'] = 0.0
     df.loc[df['link_clicks'] > 0, 'CPC_val'] = (df['spend'] / df['link_clicks'])
-    df['CPC'] = df['CPC_val'].round(0).astype(int)
+    df['CPC'] = round_amount_series(df['CPC_val'], amount_decimals)
 
     df['CVR_val'] = 0.0
     df.loc[df['link_clicks'] > 0, 'CVR_val'] = (df['purchase_count'] / df['link_clicks'] * 100)
     df['CVR'] = df['CVR_val'].round(2).astype(str) + '%'
     
-    df['구매당 비용_val'] = 0
+    df['구매당 비용_val'] = 0.0
     df.loc[df['purchase_count'] > 0, '구매당 비용_val'] = (df['spend'] / df['purchase_count'])
-    df['구매당 비용'] = df['구매당 비용_val'].round(0).astype(int)
+    df['구매당 비용'] = round_amount_series(df['구매당 비용_val'], amount_decimals)
     
     df = df.drop(columns=['CTR_val', 'CPC_val', 'CVR_val', '구매당 비용_val']) # 임시 계산 컬럼 삭제
 
@@ -512,15 +908,15 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
 
     s_time_df_aggregation_sort = time.time()
     # 합계 행 계산
-    total_spend = df['FB 광고비용'].sum()
+    total_spend = round_amount(df['FB 광고비용'].sum(), amount_decimals)
     total_impressions = df['노출'].sum()
     total_clicks = df['Click'].sum()
     total_purchases = df['구매 수'].sum()
     total_ctr_val = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
     total_ctr = f"{round(total_ctr_val, 2)}%"
-    total_cpc = round(total_spend / total_clicks) if total_clicks > 0 else 0
+    total_cpc = round_amount(total_spend / total_clicks, amount_decimals) if total_clicks > 0 else 0
     total_cvr = f"{round((total_purchases / total_clicks * 100), 2)}%" if total_clicks > 0 else "0%"
-    total_cpp = round(total_spend / total_purchases) if total_purchases > 0 else 0
+    total_cpp = round_amount(total_spend / total_purchases, amount_decimals) if total_purchases > 0 else 0
     totals_row_data = {
         '캠페인명': '', '광고세트명': '', '소재명': '합계', 'FB 광고비용': total_spend,
         '노출': total_impressions, 'Click': total_clicks, 'CTR': total_ctr,
@@ -555,9 +951,6 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
 
     df_with_total['sort_key'] = df_with_total.apply(custom_sort_key, axis=1)
     
-    # display_url, target_url 정보를 ad_id 기준으로 매핑 (정렬 후에도 유지하기 위함)
-    url_map = df.set_index('ad_id')[['display_url', 'target_url']].to_dict('index') if 'ad_id' in df.columns and not df.empty else {}
-    
     df_sorted = df_with_total.sort_values(by='sort_key', ascending=True).drop(columns=['sort_key'])
     # display_url, target_url은 이미 df_sorted에 포함되어 있음 (concat 시점에)
 
@@ -571,8 +964,8 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
     if not df_valid_cost.empty:
         # 구매당 비용이 숫자형인지 확인
         df_valid_cost['구매당 비용_num'] = pd.to_numeric(df_valid_cost['구매당 비용'])
-        # 구매당 비용이 100,000 미만인 후보군 중 상위 3개 선정
-        df_rank_candidates = df_valid_cost[df_valid_cost['구매당 비용_num'] < 100000].sort_values(by='구매당 비용_num', ascending=True)
+        # 구매당 비용이 통화별 기준(KRW: 100,000) 미만인 후보군 중 상위 3개 선정
+        df_rank_candidates = df_valid_cost[df_valid_cost['구매당 비용_num'] < poor_cost_per_purchase].sort_values(by='구매당 비용_num', ascending=True)
         top_indices = df_rank_candidates.head(3).index.tolist()
 
 
@@ -581,7 +974,7 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
         try:
             cost = float(row['구매당 비용']) # 이미 숫자형이지만, 안전하게 float 변환
             if math.isnan(cost) or math.isinf(cost) or cost == 0: return '' # 구매당 비용이 0 또는 유효하지 않으면 성과 없음
-            if cost >= 100000: return '개선 필요!'
+            if cost >= poor_cost_per_purchase: return '개선 필요!'
             
             # row.name은 concat 후의 인덱스이므로, top_indices의 인덱스와 일치하는지 확인
             if row.name in top_indices:
@@ -595,142 +988,229 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
 
     df_sorted['광고 성과'] = df_sorted.apply(categorize_performance, axis=1)
     
-    # display_url, target_url 복원 (url_map 사용, 만약 정렬 시 유실되었다면)
-    # 현재 로직에서는 df_sorted 생성 시 이미 포함되어 있음. 확인차 남겨둠.
-    # df_sorted['display_url'] = df_sorted['ad_id'].map(lambda x: url_map.get(x, {}).get('display_url', ''))
-    # df_sorted['target_url'] = df_sorted['ad_id'].map(lambda x: url_map.get(x, {}).get('target_url', ''))
-
-
     e_time_df_aggregation_sort = time.time()
     print(f"[Performance] DataFrame aggregation, sorting, and performance categorization took {e_time_df_aggregation_sort - s_time_df_aggregation_sort:.2f} seconds.")
 
-    # ▼▼▼▼▼ ROAS 기준 정렬, 상위 30개 필터링 및 최종 데이터셋 구성 ▼▼▼▼▼
-    # (전체 df에 대해 '광고 성과'가 이미 계산되었다고 가정)
-
-    # ROAS_val 컬럼이 df에 있는지 확인 (없다면 이전 단계에서 생성되어야 함)
-    if 'ROAS_val' not in df.columns:
-        # 이 경우는 이전 단계에서 ROAS_val이 제대로 생성되지 않았음을 의미. 오류 처리 또는 재생성 로직 필요.
-        # 간단히 0으로 채우거나, 에러를 발생시킬 수 있습니다.
-        # 여기서는 이전 단계에서 반드시 생성되었다고 가정합니다.
-        print("Warning: ROAS_val column not found in DataFrame before sorting by ROAS.")
-        df['ROAS_val'] = 0.0 # 임시 방편
-
-    # '소재명'이 '합계'인 행(totals_row)은 정렬 및 필터링 대상에서 제외하고 나중에 합칩니다.
-    # df_data_only = df.copy() # 만약 df가 이미 totals_row를 제외한 순수 데이터라면 그대로 사용
-
-    df_sorted_roas_all = df.sort_values(by='ROAS_val', ascending=False)
-    df_top30_roas = df_sorted_roas_all.head(30)
+    e_time_func = time.time()
+    print(f"[Performance] build_report_frame function total time: {e_time_func - s_time_func:.2f} seconds.")
+    return df_sorted
+
+
+# --- 보고서 결과 캐시 ---
+# 같은 인스턴스에서 동일한 (계정, 기간, API 버전) 요청이 다시 오면 집계 결과를 재사용합니다. (보고서 화면 + 내보내기)
+REPORT_CACHE_TTL_SECONDS = int(os.environ.get("REPORT_CACHE_TTL_SECONDS", "300")) # 0 이면 캐시 사용 안 함
+REPORT_CACHE_MAX_ENTRIES = int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", "16"))
+_report_cache = {} # key -> (저장 시각, df_sorted)
+_report_cache_lock = threading.Lock()
+
+
+def get_report_frame(start_date, end_date, ver, account, token, max_workers=DEFAULT_MAX_WORKERS, session=requests,
+                     currency=DEFAULT_CURRENCY):
+    """캐시된 보고서 DataFrame을 반환하고, 없거나 만료되었으면 build_report_frame으로 새로 만듭니다."""
+    cache_key = (account, start_date, end_date, ver, currency)
+    if REPORT_CACHE_TTL_SECONDS > 0:
+        with _report_cache_lock:
+            cached = _report_cache.get(cache_key)
+        if cached and time.time() - cached[0] < REPORT_CACHE_TTL_SECONDS:
+            print(f"[Performance] Report cache hit for {account} ({start_date} ~ {end_date}).")
+            return cached[1]
+
+    df_sorted = build_report_frame(start_date, end_date, ver, account, token, max_workers=max_workers, session=session,
+                                   currency=currency)
+    if df_sorted is not None and REPORT_CACHE_TTL_SECONDS > 0:
+        with _report_cache_lock:
+            _report_cache[cache_key] = (time.time(), df_sorted)
+            while len(_report_cache) > REPORT_CACHE_MAX_ENTRIES: # 가장 오래된 항목부터 제거
+                oldest_key = min(_report_cache, key=lambda k: _report_cache[k][0])
+                del _report_cache[oldest_key]
+    return df_sorted
+
+
+def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token, render_mode=RENDER_MODE_HTML,
+                                       currency=DEFAULT_CURRENCY, max_workers=DEFAULT_MAX_WORKERS, session=requests): #
+    s_time_func = time.time()
+    df_sorted = get_report_frame(start_date, end_date, ver, account, token, max_workers=max_workers, session=session,
+                                 currency=currency)
+    if df_sorted is None:
+        return {"html_table": "<p>선택한 기간 및 계정에 대한 데이터가 없습니다.</p>", "data": []}
 
-    # 합계행은 전체 데이터 기준 totals_row 사용 (이전에 계산된 totals_row Series 사용)
-    df_final_for_frontend = pd.concat([pd.DataFrame([totals_row]), df_top30_roas], ignore_index=True)
+    if render_mode == RENDER_MODE_DATA:
+        # 클라이언트 렌더링 모드: HTML 생성을 건너뛰고 데이터만 반환 (광고 콘텐츠 셀 표시를 위해 URL 컬럼 유지)
+        cleaned_records = build_report_records(df_sorted, keep_urls=True)
+        e_time_func = time.time()
+        print(f"[Performance] fetch_and_format_facebook_ads_data function total time: {e_time_func - s_time_func:.2f} seconds. (render: {render_mode})")
+        return {"data": cleaned_records, "currency": currency, "currency_format": get_currency_format(currency)}
 
-    # iter_df를 df_final_for_frontend로 설정하여 HTML 렌더링에 사용
-    iter_df = df_final_for_frontend
-    # ▲▲▲▲▲ ROAS 필터링 및 최종 데이터셋 구성 완료 ▲▲▲▲▲
     s_time_html_render = time.time()
-    # HTML 테이블 생성
-    def format_currency(amount): return f"{int(amount):,} ₩" if pd.notna(amount) and isinstance(amount, (int, float)) and not (math.isnan(amount) or math.isinf(amount)) else "0 ₩"
-    def format_number(num): return f"{int(num):,}" if pd.notna(num) and isinstance(num, (int, float)) and not (math.isnan(num) or math.isinf(num)) else "0"
-
-    # HTML 테이블 생성 시 필요한 컬럼만 선택
-    # 'ad_id', 'display_url', 'target_url'은 HTML 생성에 직접 사용되지 않지만, 
-    # '광고 콘텐츠' 셀 생성 시 df_sorted 에서 가져와 사용
-    iter_df = df_sorted # 모든 필요한 컬럼이 df_sorted에 있어야 함
-
-    html_table_rows = []
-    header_row = """
-      <tr>
-        <th>캠페인명</th> <th>광고세트명</th> <th>소재명</th> <th>FB 광고비용</th>
-        <th>노출</th> <th>Click</th> <th>CTR</th> <th>CPC</th> <th>CVR</th>
-        <th>구매 수</th> <th>구매당 비용</th> <th>광고 성과</th> <th>콘텐츠 유형</th> <th>광고 콘텐츠</th>
-      </tr>
-    """
-    html_table_rows.append(header_row)
-
-    for index, row in iter_df.iterrows():
-        row_class = 'total-row' if row['소재명'] == '합계' else ''
-        performance_text = row.get('광고 성과', '')
-        performance_class = ''
-        if performance_text == '위닝 콘텐츠': performance_class = 'winning-content'
-        elif performance_text == '고성과 콘텐츠': performance_class = 'medium-performance'
-        elif performance_text == '성과 콘텐츠': performance_class = 'third-performance'
-        elif performance_text == '개선 필요!': performance_class = 'needs-improvement'
-
-        # 광고 콘텐츠 태그 생성 (display_url, target_url 사용)
-        # df_sorted에서 직접 가져오도록 수정
-        display_url = row.get('display_url', '')
-        target_url = row.get('target_url', '')
-        
-        content_tag = ""
-        if display_url:
-            img_tag = f'<img src="{display_url}" class="ad-content-thumbnail" alt="광고 콘텐츠">'
-            content_tag = f'<a href="{target_url}" target="_blank">{img_tag}</a>' if isinstance(target_url, str) and target_url.startswith('http') else img_tag
-        elif row['소재명'] != '합계': content_tag = "-"
-
-
-        html_table_rows.append(f"""
-        <tr class="{row_class}">
-          <td>{row.get('캠페인명','')}</td> <td>{row.get('광고세트명','')}</td> <td>{row.get('소재명','')}</td>
-          <td>{format_currency(row.get('FB 광고비용',0))}</td> <td>{format_number(row.get('노출',0))}</td>
-          <td>{format_number(row.get('Click',0))}</td> <td>{row.get('CTR','0%')}</td>
-          <td>{format_currency(row.get('CPC',0))}</td> <td>{row.get('CVR','0%')}</td>
-          <td>{format_number(row.get('구매 수',0))}</td> <td>{format_currency(row.get('구매당 비용',0))}</td>
-          <td class="{performance_class}">{performance_text}</td>
-          <td>{row.get('콘텐츠 유형','')}</td> <td class="ad-content-cell">{content_tag}</td>
-        </tr>
-        """)
-    
-    # CSS 스타일은 외부 파일 또는 HTML 템플릿에 정의하는 것이 좋지만, 현재 구조 유지
-    html_table_full = f"""
-    <style>
-    table {{border-collapse: collapse; width: 100%;}}
-    th, td {{padding: 8px; border-bottom: 1px solid #ddd;}}
-    th {{background-color: #f2f2f2; text-align: center; white-space: nowrap; vertical-align: middle;}}
-    td {{text-align: right; white-space: nowrap; vertical-align: middle;}}
-    td:nth-child(1), td:nth-child(2), td:nth-child(3) {{ text-align: left; }}
-    td:nth-child(12), td:nth-child(13) {{ text-align: center; }} /* 광고 성과, 콘텐츠 유형 */
-    tr:hover {{background-color: #f5f5f5;}}
-    .total-row {{background-color: #e6f2ff; font-weight: bold;}}
-    .winning-content {{color: #009900; font-weight: bold;}}
-    .medium-performance {{color: #E69900; font-weight: bold;}}
-    .third-performance {{color: #FF9900; font-weight: bold;}}
-    .needs-improvement {{color: #FF0000; font-weight: bold;}}
-    a {{text-decoration: none; color: inherit;}}
-    img.ad-content-thumbnail {{max-width:100px; max-height:100px; vertical-align: middle; border-radius: 6px; box-shadow: 0 2px 8px rgba(0,0,0,0.07);}}
-    td.ad-content-cell {{ text-align: center; }}
-    </style>
-    <table>
-      {''.join(html_table_rows)}
-    </table>
-    """
+    # 모든 필요한 컬럼이 df_sorted에 있어야 함 (display_url, target_url 포함)
+    html_table_full = render_html_table(df_sorted, currency=currency)
     e_time_html_render = time.time()
     print(f"[Performance] HTML table rendering took {e_time_html_render - s_time_html_render:.2f} seconds.")
 
-
     # JSON 반환용 데이터 준비 (ad_id, display_url, target_url 제외)
-    df_for_json = df_sorted.drop(columns=['ad_id', 'display_url', 'target_url'], errors='ignore')
-
-    def clean_numeric(data): #
-        if isinstance(data, dict): return {k: clean_numeric(v) for k, v in data.items()}
-        elif isinstance(data, list): return [clean_numeric(item) for item in data]
-        elif isinstance(data, (int, float)):
-            if math.isinf(data) or math.isnan(data): return 0 # 또는 None이나 적절한 값
-            return data
-        elif not isinstance(data, (str, bool)) and data is not None: # 추가: data가 None이 아닌 경우만 처리
-            try: 
-                if hasattr(data, 'item'): return data.item() # NumPy type 처리
-            except: pass # 실패 시 문자열로 변환
-            return str(data) # 그 외 타입은 문자열로
-        return data
+    cleaned_records = build_report_records(df_sorted)
 
-    records = df_for_json.to_dict(orient='records')
-    cleaned_records = clean_numeric(records)
-    
     e_time_func = time.time()
     print(f"[Performance] fetch_and_format_facebook_ads_data function total time: {e_time_func - s_time_func:.2f} seconds.")
 
     return {"html_table": html_table_full, "data": cleaned_records}
 
+# --- 보고서 내보내기 (CSV/XLSX/Parquet) ---
+# 집계된 광고별 전체 행을 EXPORT_CHUNK_ROWS 단위로 나눠 쓰면서 스트리밍합니다. (화면용 HTML을 거치지 않음)
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_READ_BLOCK_BYTES = 64 * 1024
+EXPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024 # 이보다 큰 XLSX 파일은 디스크 임시 파일로 넘어감
+EXPORT_COLUMNS = [
+    '캠페인명', '광고세트명', '소재명', 'FB 광고비용', '노출', 'Click', 'CTR', 'CPC', 'CVR',
+    '구매 수', '구매당 비용', '광고 성과', '콘텐츠 유형', 'ad_id', 'display_url', 'target_url'
+]
+# 사용자 입력(광고/캠페인/광고세트 이름 등)이 들어가는 텍스트 컬럼: 스프레드시트에서 수식으로 해석되지 않도록 처리
+EXPORT_TEXT_COLUMNS = ['캠페인명', '광고세트명', '소재명', '광고 성과', '콘텐츠 유형', 'ad_id', 'display_url', 'target_url']
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def build_export_frame(df_sorted):
+    """보고서 DataFrame에서 합계 행을 빼고 내보내기용 컬럼만 남깁니다. (상위 30개 제한 없이 전체 행)"""
+    export_df = df_sorted[df_sorted['소재명'] != '합계']
+    export_df = export_df[[col for col in EXPORT_COLUMNS if col in export_df.columns]]
+    return export_df.infer_objects().reset_index(drop=True)
+
+
+def _iter_export_chunks(df):
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        yield df.iloc[start:start + EXPORT_CHUNK_ROWS]
+
+
+def _iter_file_blocks(file_obj):
+    try:
+        file_obj.seek(0)
+        while True:
+            block = file_obj.read(EXPORT_READ_BLOCK_BYTES)
+            if not block:
+                break
+            yield block
+    finally:
+        file_obj.close()
+
+
+class _DrainableBuffer:
+    # pyarrow 가 쓴 바이트를 모아 두었다가 행 그룹마다 꺼내 보내기 위한 쓰기 전용 파일 객체
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _text_columns(df):
+    return [col for col in EXPORT_TEXT_COLUMNS if col in df.columns]
+
+
+def _neutralise_csv_formula(value):
+    # Excel 이 수식으로 실행하지 않도록 =, +, -, @ 등으로 시작하는 텍스트 앞에 작은따옴표 추가
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_csv(df):
+    text_columns = _text_columns(df)
+
+    def generate():
+        yield '\ufeff'.encode('utf-8') # Excel 에서 한글이 깨지지 않도록 BOM 추가
+        for i, chunk in enumerate(_iter_export_chunks(df)):
+            chunk = chunk.copy()
+            for col in text_columns:
+                chunk[col] = chunk[col].map(_neutralise_csv_formula)
+            yield chunk.to_csv(index=False, header=(i == 0)).encode('utf-8')
+        if df.empty:
+            yield df.to_csv(index=False).encode('utf-8')
+    return 'text/csv; charset=utf-8', generate()
+
+
+def export_xlsx(df):
+    from openpyxl import Workbook # 선택적 의존성
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    text_positions = {df.columns.get_loc(col) for col in _text_columns(df)}
+
+    def text_cell(sheet, value):
+        # XLSX 에 쓸 수 없는 제어 문자를 지우고, '=' 로 시작해도 수식이 아닌 문자열 셀로 기록
+        if value is None:
+            return None
+        cell = WriteOnlyCell(sheet, value=ILLEGAL_CHARACTERS_RE.sub('', str(value)))
+        cell.data_type = 's'
+        return cell
+
+    def generate():
+        workbook = Workbook(write_only=True) # 행을 메모리에 쌓지 않고 임시 파일로 기록
+        sheet = workbook.create_sheet(title='광고 성과')
+        sheet.append(list(df.columns))
+        for chunk in _iter_export_chunks(df):
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            for row in chunk.itertuples(index=False, name=None):
+                sheet.append([text_cell(sheet, v) if i in text_positions else v for i, v in enumerate(row)])
+        output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+        workbook.save(output)
+        yield from _iter_file_blocks(output)
+    return 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', generate()
+
+
+def export_parquet(df):
+    import pyarrow as pa # 선택적 의존성
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+
+    def generate():
+        sink = _DrainableBuffer()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for chunk in _iter_export_chunks(df):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield sink.drain() # 행 그룹 단위로 바로 전송
+        yield sink.drain() # 파일 푸터
+    return 'application/vnd.apache.parquet', generate()
+
+
+REPORT_EXPORTERS = {
+    'csv': export_csv,
+    'xlsx': export_xlsx,
+    'parquet': export_parquet,
+}
+# 형식별 선택적 의존성 (pyarrow 는 배포 용량 때문에 requirements.txt 에 넣지 않음)
+REPORT_EXPORT_DEPENDENCIES = {
+    'xlsx': 'openpyxl',
+    'parquet': 'pyarrow',
+}
+
+
+def available_export_formats():
+    """이 서버에 필요한 패키지가 설치되어 있어 실제로 내보낼 수 있는 형식 목록 (화면의 내보내기 버튼 표시에 사용)."""
+    return [
+        export_format for export_format in REPORT_EXPORTERS
+        if export_format not in REPORT_EXPORT_DEPENDENCIES
+        or importlib.util.find_spec(REPORT_EXPORT_DEPENDENCIES[export_format]) is not None
+    ]
+
 # Flask 앱 실행 (로컬 테스트 시 주석 해제)
 # if __name__ == '__main__':
 #     # 로컬 테스트를 위한 환경 변수 설정 예시
@@ -738,5 +1218,6 @@ def fetch_and_format_facebook_ads_data(start_date, end_date, ver, account, token
 #     os.environ["ACCOUNT_CONFIG_1_NAME"] = "TestAccount"
 #     os.environ["ACCOUNT_CONFIG_1_ID"] = "act_your_account_id" # 실제 테스트용 계정 ID
 #     os.environ["ACCOUNT_CONFIG_1_TOKEN"] = "your_access_token" # 실제 테스트용 액세스 토큰
-#     ACCOUNT_CONFIGS = load_account_configs() # 환경변수 로드 후 재할당
+#     _env_account_configs.update(load_account_configs()) # 환경변수 로드 후 재할당
+#     _account_registry["mtime"] = -1 # 다음 요청에서 계정 설정 다시 로드
 #     app.run(debug=True, port=5001)
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""/api/generate-report 부하 테스트.
+
+Flask 앱을 별도 프로세스로 띄우고 Graph API 대신 로컬 모의 서버(mock_graph_server.py)에 연결한 뒤,
+N명의 동시 사용자가 여러 계정/기간으로 보고서를 요청하게 합니다.
+시나리오(동시 사용자 수 x 계정별 max_workers)마다 req/s, 지연 시간 백분위, 앱 프로세스의 스레드 수와 RSS를 측정하고
+비교 표를 출력합니다. --output 으로 결과를 저장하고 --baseline 으로 이전 결과와 비교할 수 있습니다.
+
+예시:
+  python benchmarks/load_test.py --users 1 5 10 --max-workers 5 15 --duration 20
+  python benchmarks/load_test.py --users 10 --max-workers 15 --output before.json
+  python benchmarks/load_test.py --users 10 --max-workers 30 --baseline before.json
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+
+from mock_graph_server import MockGraphServer, parse_account_specs
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'loadtest'
+APP_BOOT = (
+    "import sys; sys.path.insert(0, sys.argv[1]);"
+    "from werkzeug.serving import run_simple; from api.index import app;"
+    "run_simple('127.0.0.1', int(sys.argv[2]), app, threaded=True)"
+)
+SAMPLE_INTERVAL_SECONDS = 0.1
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    # nearest-rank 방식: ceil(p/100 * n) 번째 값
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[index]
+
+
+def read_process_stats(pid):
+    # Linux /proc 기준 (스레드 수, RSS MB). 읽을 수 없으면 (None, None)
+    threads = rss_mb = None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    threads = int(line.split()[1])
+                elif line.startswith('VmRSS:'):
+                    rss_mb = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return threads, rss_mb
+
+
+class ProcessSampler(threading.Thread):
+    def __init__(self, pid):
+        super().__init__(name='process-sampler', daemon=True)
+        self.pid = pid
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            threads, rss_mb = read_process_stats(self.pid)
+            if threads is not None:
+                self.samples.append((threads, rss_mb))
+            self._stop_event.wait(SAMPLE_INTERVAL_SECONDS)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def summary(self):
+        if not self.samples:
+            return {'threads_peak': None, 'threads_mean': None, 'rss_peak_mb': None, 'rss_mean_mb': None}
+        threads = [s[0] for s in self.samples]
+        rss = [s[1] for s in self.samples]
+        return {
+            'threads_peak': max(threads),
+            'threads_mean': round(sum(threads) / len(threads), 1),
+            'rss_peak_mb': round(max(rss), 1),
+            'rss_mean_mb': round(sum(rss) / len(rss), 1),
+        }
+
+
+def write_registry(path, accounts, max_workers):
+    entries = [
+        {'name': f"LoadTest {i}", 'id': account_id, 'token': 'mock-token', 'max_workers': max_workers}
+        for i, account_id in enumerate(accounts, start=1)
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'accounts': entries}, f, ensure_ascii=False)
+    return [entry['name'] for entry in entries]
+
+
+def start_app(port, graph_base_url, registry_path, use_cache, app_log):
+    env = {k: v for k, v in os.environ.items() if not k.startswith('ACCOUNT_CONFIG_')}
+    env.update({
+        'REPORT_PASSWORD': PASSWORD,
+        'ACCOUNT_REGISTRY_PATH': registry_path,
+        'GRAPH_API_BASE_URL': graph_base_url,
+        'REPORT_CACHE_TTL_SECONDS': env.get('REPORT_CACHE_TTL_SECONDS', '300') if use_cache else '0',
+    })
+    proc = subprocess.Popen(
+        [sys.executable, '-c', APP_BOOT, REPO_ROOT, str(port)],
+        env=env, stdout=app_log, stderr=subprocess.STDOUT,
+    )
+    app_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Flask app exited during startup (code {proc.returncode}).")
+        try:
+            if requests.get(f"{app_url}/api", timeout=1).ok:
+                return proc, app_url
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("Flask app did not become ready within 30 seconds.")
+
+
+def date_ranges(days_list):
+    end = date.today() - timedelta(days=1)
+    return [((end - timedelta(days=days - 1)).isoformat(), end.isoformat()) for days in days_list]
+
+
+def user_loop(user_id, app_url, account_names, ranges, stop_at, max_requests, results, seed):
+    rng = random.Random(seed + user_id)
+    session = requests.Session()
+    sent = 0
+    while time.time() < stop_at and (not max_requests or sent < max_requests):
+        start_date, end_date = rng.choice(ranges)
+        body = {
+            'password': PASSWORD,
+            'selected_account_key': rng.choice(account_names),
+            'start_date': start_date,
+            'end_date': end_date,
+            'render': 'data',
+        }
+        s_time = time.perf_counter()
+        try:
+            response = session.post(f"{app_url}/api/generate-report", json=body, timeout=300)
+            ok = response.status_code == 200 and 'error' not in response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            ok = False
+        results.append((time.perf_counter() - s_time, ok))
+        sent += 1
+
+
+def run_scenario(args, mock, users, max_workers):
+    accounts = list(mock.accounts)
+    ranges = date_ranges(args.days)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        registry_path = os.path.join(tmp_dir, 'accounts.json')
+        account_names = write_registry(registry_path, accounts, max_workers)
+        app_log = open(args.app_log, 'a') if args.app_log else subprocess.DEVNULL
+        proc, app_url = start_app(free_port(), mock.base_url, registry_path, args.cache, app_log)
+        try:
+            idle_threads, idle_rss_mb = read_process_stats(proc.pid)
+            mock.reset_count()
+            sampler = ProcessSampler(proc.pid)
+            sampler.start()
+
+            results = []
+            s_time = time.perf_counter()
+            stop_at = time.time() + args.duration
+            workers = [
+                threading.Thread(target=user_loop, args=(i, app_url, account_names, ranges, stop_at, args.requests, results, args.seed))
+                for i in range(users)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - s_time
+
+            sampler.stop()
+            graph_calls = mock.reset_count()
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            if app_log is not subprocess.DEVNULL:
+                app_log.close()
+
+    latencies = sorted(latency for latency, ok in results if ok)
+    completed = len(latencies)
+    result = {
+        'users': users,
+        'max_workers': max_workers,
+        'requests': len(results),
+        'errors': len(results) - completed,
+        'elapsed_s': round(elapsed, 2),
+        'req_per_s': round(completed / elapsed, 2) if elapsed else 0.0,
+        'latency_p50_s': round(percentile(latencies, 50), 3),
+        'latency_p90_s': round(percentile(latencies, 90), 3),
+        'latency_p95_s': round(percentile(latencies, 95), 3),
+        'latency_p99_s': round(percentile(latencies, 99), 3),
+        'latency_max_s': round(latencies[-1], 3) if latencies else 0.0,
+        'graph_calls_per_report': round(graph_calls / completed, 1) if completed else None,
+        'threads_idle': idle_threads,
+        'rss_idle_mb': round(idle_rss_mb, 1) if idle_rss_mb is not None else None,
+    }
+    result.update(sampler.summary())
+    return result
+
+
+REPORT_COLUMNS = [
+    ('users', 'users'), ('max_workers', 'workers'), ('req_per_s', 'req/s'),
+    ('latency_p50_s', 'p50 s'), ('latency_p95_s', 'p95 s'), ('latency_p99_s', 'p99 s'),
+    ('errors', 'errors'), ('threads_peak', 'threads peak'), ('rss_peak_mb', 'RSS peak MB'),
+]
+
+
+def format_value(value):
+    if value is None:
+        return '-'
+    return f"{value:,.3f}".rstrip('0').rstrip('.') if isinstance(value, float) else str(value)
+
+
+def format_delta(value, base):
+    if value is None or not base:
+        return ''
+    return f" ({(value - base) / base * 100:+.0f}%)"
+
+
+def print_report(results, baseline=None):
+    # 같은 (users, max_workers) 시나리오가 baseline 에 있으면 변화율을 함께 표시
+    baseline_map = {(r['users'], r['max_workers']): r for r in (baseline or [])}
+    header = '| ' + ' | '.join(label for _, label in REPORT_COLUMNS) + ' |'
+    print(header)
+    print('|' + '|'.join('---' for _ in REPORT_COLUMNS) + '|')
+    for result in results:
+        base = baseline_map.get((result['users'], result['max_workers']))
+        cells = []
+        for key, _ in REPORT_COLUMNS:
+            cell = format_value(result.get(key))
+            if base and key not in ('users', 'max_workers'):
+                cell += format_delta(result.get(key), base.get(key))
+            cells.append(cell)
+        print('| ' + ' | '.join(cells) + ' |')
+    if baseline_map and not any((r['users'], r['max_workers']) in baseline_map for r in results):
+        print("\n(baseline 에 같은 users/max_workers 시나리오가 없어 변화율을 표시하지 않았습니다.)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/generate-report 부하 테스트 (로컬 Graph API 모의 서버 사용)")
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 5, 10], help="동시 사용자 수 (여러 개 지정 시 각각 실행)")
+    parser.add_argument('--max-workers', type=int, nargs='+', default=[15], help="계정별 max_workers (여러 개 지정 시 각각 실행)")
+    parser.add_argument('--accounts', nargs='+', default=['act_mock_1=50', 'act_mock_2=200', 'act_mock_3=600'], help="계정ID=광고수 (30일 기준, 짧은 기간은 비례해서 적게 반환)")
+    parser.add_argument('--days', type=int, nargs='+', default=[1, 7, 30], help="요청 기간 길이(일) 목록 (모의 서버는 기간에 비례해 광고 행 수를 반환)")
+    parser.add_argument('--duration', type=float, default=15.0, help="시나리오당 측정 시간(초)")
+    parser.add_argument('--requests', type=int, default=0, help="사용자당 최대 요청 수 (0이면 duration 동안 계속)")
+    parser.add_argument('--graph-latency-ms', type=float, default=20.0, help="모의 Graph API 응답 지연(ms)")
+    parser.add_argument('--cache', action='store_true', help="보고서 캐시 사용 (기본: 끄고 전체 파이프라인 측정)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--app-log', help="Flask 앱 로그를 저장할 파일 (기본: 버림)")
+    parser.add_argument('--output', help="결과를 JSON 으로 저장할 경로")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON 경로")
+    args = parser.parse_args()
+
+    mock = MockGraphServer(parse_account_specs(args.accounts), latency_ms=args.graph_latency_ms).start()
+    results = []
+    try:
+        for users, max_workers in itertools.product(args.users, args.max_workers):
+            print(f"Running scenario: users={users}, max_workers={max_workers} ({args.duration:g}s)...", flush=True)
+            results.append(run_scenario(args, mock, users, max_workers))
+    finally:
+        mock.stop()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print()
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'settings': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')}, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""부하 테스트용 로컬 Facebook Graph API 모의 서버.
+
+보고서 생성에 쓰이는 엔드포인트만 흉내 냅니다.
+  /{ver}/{account}/insights          광고 단위 인사이트 (after 커서로 페이지 나눔)
+                                     time_range 기간이 길수록 집행된 광고(행)가 많아짐: 30일 이상이면 계정 광고 수 전체
+  /{ver}/{ad_id}?fields=creative{id}  광고 -> 크리에이티브 ID
+  /{ver}/cr_{ad_id}                   크리에이티브 상세 (짝수 광고: 사진, 홀수 광고: 동영상)
+  /{ver}/vid_{ad_id}?fields=source    동영상 소스 URL
+
+단독 실행: python benchmarks/mock_graph_server.py --port 8765 --accounts act_mock_1=200 act_mock_2=1000
+"""
+import argparse
+import json
+import math
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+PAGE_LIMIT = 500
+FULL_RANGE_DAYS = 30 # 이 기간(일) 이상이면 계정의 모든 광고가 집행된 것으로 봄
+
+
+class MockGraphServer:
+    """accounts: {계정 ID: 30일 기준 광고 수}. latency_ms 만큼 매 요청을 지연시켜 실제 API 왕복 시간을 흉내 냅니다."""
+
+    def __init__(self, accounts, host='127.0.0.1', port=0, latency_ms=0.0):
+        self.accounts = dict(accounts)
+        self.latency_ms = latency_ms
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='mock-graph', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_count(self):
+        with self._count_lock:
+            count, self.request_count = self.request_count, 0
+        return count
+
+    def _count(self):
+        with self._count_lock:
+            self.request_count += 1
+
+    # --- 응답 생성 ---
+    @staticmethod
+    def range_days(since, until):
+        # time_range 기간(일). 없거나 잘못된 값이면 FULL_RANGE_DAYS
+        try:
+            return max(1, (date.fromisoformat(until) - date.fromisoformat(since)).days + 1)
+        except (TypeError, ValueError):
+            return FULL_RANGE_DAYS
+
+    def insights_page(self, ver, account, after, limit, since=None, until=None):
+        n_ads_full = self.accounts.get(account)
+        if n_ads_full is None:
+            return 400, {"error": {"message": f"Unknown account {account}", "code": 100}}
+        # 기간이 짧을수록 집행된 광고가 적고, 광고별 지표는 기간(일)에 비례
+        days = self.range_days(since, until)
+        n_ads = max(1, math.ceil(n_ads_full * min(days, FULL_RANGE_DAYS) / FULL_RANGE_DAYS))
+        end = min(after + limit, n_ads)
+        account_num = account.rsplit('_', 1)[-1]
+        data = []
+        for i in range(after, end):
+            clicks = (20 + i % 300) * days
+            data.append({
+                'ad_id': f"{account_num}{i:07d}",
+                'ad_name': f"소재 {i} <{account}>",
+                'campaign_name': f"캠페인 {i % 12}",
+                'adset_name': f"광고세트 {i % 40}",
+                'spend': str((1000 + (i * 37) % 90000) * days),
+                'impressions': str((2000 + i * 11) * days),
+                'clicks': str(clicks),
+                'actions': [{'action_type': 'purchase', 'value': str((i % 9) * days)}],
+                'action_values': [{'action_type': 'purchase', 'value': str((i % 9) * days * 32000)}],
+            })
+        body = {'data': data, 'paging': {}}
+        if end < n_ads:
+            query = {'after': end, 'limit': limit, 'access_token': 'mock'}
+            if since and until:
+                query.update({'time_range[since]': since, 'time_range[until]': until})
+            query = urlencode(query)
+            body['paging']['next'] = f"{self.base_url}/{ver}/{account}/insights?{query}"
+        return 200, body
+
+    def object_response(self, object_id, fields):
+        if object_id.startswith('cr_'):
+            ad_id = object_id[3:]
+            if int(ad_id[-1]) % 2:
+                return 200, {'id': object_id, 'object_type': 'VIDEO', 'video_id': f"vid_{ad_id}",
+                             'thumbnail_url': f"https://mock.example.com/thumb/{ad_id}.jpg"}
+            return 200, {'id': object_id, 'object_type': 'PHOTO', 'image_url': f"https://mock.example.com/img/{ad_id}.jpg"}
+        if object_id.startswith('vid_'):
+            return 200, {'id': object_id, 'source': f"https://mock.example.com/video/{object_id}.mp4"}
+        if 'creative' in fields:
+            return 200, {'id': object_id, 'creative': {'id': f"cr_{object_id}"}}
+        return 404, {"error": {"message": f"Unknown object {object_id}", "code": 803}}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # keep-alive (앱의 커넥션 풀 재사용을 측정하기 위함)
+
+            def do_GET(self):
+                server._count()
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = [p for p in url.path.split('/') if p]
+                if len(parts) == 3 and parts[2] == 'insights':
+                    after = int(query.get('after', ['0'])[0])
+                    limit = int(query.get('limit', [str(PAGE_LIMIT)])[0])
+                    status, body = server.insights_page(
+                        parts[0], parts[1], after, limit,
+                        since=query.get('time_range[since]', [None])[0], until=query.get('time_range[until]', [None])[0],
+                    )
+                elif len(parts) == 2:
+                    status, body = server.object_response(parts[1], query.get('fields', [''])[0])
+                else:
+                    status, body = 404, {"error": {"message": "Unsupported path", "code": 803}}
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def parse_account_specs(specs):
+    # 'act_mock_1=200' 형식 -> {'act_mock_1': 200}
+    accounts = {}
+    for spec in specs:
+        account, _, n_ads = spec.partition('=')
+        accounts[account] = int(n_ads or 100)
+    return accounts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Facebook Graph API 모의 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--accounts', nargs='+', default=['act_mock_1=200'], help="계정ID=광고수 (30일 기준)")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+    mock = MockGraphServer(parse_account_specs(args.accounts), args.host, args.port, args.latency_ms).start()
+    print(f"Mock Graph API server listening on {mock.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
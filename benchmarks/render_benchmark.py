@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""보고서 렌더러 처리량 벤치마크.
+
+기존 iterrows + f-string 방식, 템플릿 일괄 렌더러(render_html_table),
+HTML 없이 데이터만 보내는 방식(build_report_records + JSON 직렬화)을 1k / 10k / 50k 행에서 비교합니다.
+
+실행: python benchmarks/render_benchmark.py [--rows 1000 10000 50000] [--repeat 3]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from api.index import RENDER_MODE_DATA, RENDER_MODE_HTML, build_report_records, render_html_table  # noqa: E402
+
+COLUMN_ORDER = [
+    '캠페인명', '광고세트명', '소재명', 'FB 광고비용', '노출', 'Click', 'CTR', 'CPC', 'CVR',
+    '구매 수', '구매당 비용', 'ad_id', '광고 성과', '콘텐츠 유형', 'display_url', 'target_url'
+]
+PERFORMANCE_LABELS = ['', '', '', '', '위닝 콘텐츠', '고성과 콘텐츠', '성과 콘텐츠', '개선 필요!']
+
+
+def make_report_frame(n_rows):
+    # fetch_and_format_facebook_ads_data 의 df_sorted 와 같은 형태의 합성 데이터 (첫 행은 합계)
+    rows = [{
+        '캠페인명': '', '광고세트명': '', '소재명': '합계', 'FB 광고비용': 0, '노출': 0, 'Click': 0,
+        'CTR': '0%', 'CPC': 0, 'CVR': '0%', '구매 수': 0, '구매당 비용': 0, 'ad_id': '',
+        '광고 성과': '', '콘텐츠 유형': '', 'display_url': '', 'target_url': ''
+    }]
+    for i in range(n_rows):
+        rows.append({
+            '캠페인명': f'캠페인 {i % 20} <spring & sale>', '광고세트명': f'광고세트 "{i % 100}"',
+            '소재명': f'소재 {i}', 'FB 광고비용': 1000 + i * 7, '노출': 10000 + i * 13, 'Click': 100 + i % 500,
+            'CTR': f'{(i % 700) / 100}%', 'CPC': 100 + i % 900, 'CVR': f'{(i % 300) / 100}%',
+            '구매 수': i % 40, '구매당 비용': (i * 37) % 150000, 'ad_id': str(23850000000000000 + i),
+            '광고 성과': PERFORMANCE_LABELS[i % len(PERFORMANCE_LABELS)],
+            '콘텐츠 유형': '동영상' if i % 2 else '사진',
+            'display_url': f'https://scontent.example.com/{i}.jpg' if i % 10 else '',
+            'target_url': f'https://www.facebook.com/watch/?v={i}' if i % 3 else '',
+        })
+    return pd.DataFrame(rows, columns=COLUMN_ORDER)
+
+
+def render_legacy(df):
+    # 기존 구현 (iterrows + f-string, 이스케이프 없음) - 비교 기준
+    def format_currency(amount): return f"{int(amount):,} ₩" if pd.notna(amount) and isinstance(amount, (int, float)) and not (math.isnan(amount) or math.isinf(amount)) else "0 ₩"
+    def format_number(num): return f"{int(num):,}" if pd.notna(num) and isinstance(num, (int, float)) and not (math.isnan(num) or math.isinf(num)) else "0"
+
+    html_table_rows = []
+    for index, row in df.iterrows():
+        row_class = 'total-row' if row['소재명'] == '합계' else ''
+        performance_text = row.get('광고 성과', '')
+        performance_class = ''
+        if performance_text == '위닝 콘텐츠': performance_class = 'winning-content'
+        elif performance_text == '고성과 콘텐츠': performance_class = 'medium-performance'
+        elif performance_text == '성과 콘텐츠': performance_class = 'third-performance'
+        elif performance_text == '개선 필요!': performance_class = 'needs-improvement'
+        display_url = row.get('display_url', '')
+        target_url = row.get('target_url', '')
+        content_tag = ""
+        if display_url:
+            img_tag = f'<img src="{display_url}" class="ad-content-thumbnail" alt="광고 콘텐츠">'
+            content_tag = f'<a href="{target_url}" target="_blank">{img_tag}</a>' if isinstance(target_url, str) and target_url.startswith('http') else img_tag
+        elif row['소재명'] != '합계': content_tag = "-"
+        html_table_rows.append(f"""
+        <tr class="{row_class}">
+          <td>{row.get('캠페인명','')}</td> <td>{row.get('광고세트명','')}</td> <td>{row.get('소재명','')}</td>
+          <td>{format_currency(row.get('FB 광고비용',0))}</td> <td>{format_number(row.get('노출',0))}</td>
+          <td>{format_number(row.get('Click',0))}</td> <td>{row.get('CTR','0%')}</td>
+          <td>{format_currency(row.get('CPC',0))}</td> <td>{row.get('CVR','0%')}</td>
+          <td>{format_number(row.get('구매 수',0))}</td> <td>{format_currency(row.get('구매당 비용',0))}</td>
+          <td class="{performance_class}">{performance_text}</td>
+          <td>{row.get('콘텐츠 유형','')}</td> <td class="ad-content-cell">{content_tag}</td>
+        </tr>
+        """)
+    html_table = f"<table>{''.join(html_table_rows)}</table>"
+    return json.dumps({"html_table": html_table, "data": build_report_records(df)}, ensure_ascii=False)
+
+
+def render_template(df):
+    return json.dumps({"html_table": render_html_table(df), "data": build_report_records(df)}, ensure_ascii=False)
+
+
+def render_data_only(df):
+    return json.dumps({"data": build_report_records(df, keep_urls=True)}, ensure_ascii=False)
+
+
+RENDERERS = [
+    ('legacy (iterrows)', render_legacy),
+    (f'template ({RENDER_MODE_HTML})', render_template),
+    (f'data only ({RENDER_MODE_DATA})', render_data_only),
+]
+
+
+def run(row_counts, repeat):
+    print(f"{'rows':>8} | {'renderer':<22} | {'best (s)':>9} | {'rows/s':>12} | {'payload (KB)':>12}")
+    print('-' * 76)
+    for n_rows in row_counts:
+        df = make_report_frame(n_rows)
+        for label, renderer in RENDERERS:
+            timings = []
+            for _ in range(repeat):
+                s_time = time.perf_counter()
+                payload = renderer(df)
+                timings.append(time.perf_counter() - s_time)
+            best = min(timings)
+            print(f"{n_rows:>8} | {label:<22} | {best:>9.3f} | {n_rows / best:>12,.0f} | {len(payload.encode('utf-8')) / 1024:>12,.0f}")
+        print('-' * 76)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="보고서 렌더러 처리량 벤치마크")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -19,6 +19,94 @@ document.addEventListener("DOMContentLoaded", function() {
 
   setDefaultDate();
 
+  // 서버에서 사용 가능한 내보내기 형식만 버튼 표시 (예: pyarrow 가 없으면 Parquet 숨김)
+  fetch("/api")
+    .then(res => res.ok ? res.json() : Promise.reject())
+    .then(data => {
+      if (!Array.isArray(data.export_formats)) return;
+      document.querySelectorAll(".export-btn").forEach(button => {
+        button.hidden = !data.export_formats.includes(button.dataset.format);
+      });
+    })
+    .catch(() => {});
+
+  // 보고서 테이블 클라이언트 렌더링 (서버는 render: "data" 요청 시 데이터만 보냄)
+  const REPORT_COLUMNS = [
+    { key: "캠페인명" }, { key: "광고세트명" }, { key: "소재명" },
+    { key: "FB 광고비용", format: "currency" }, { key: "노출", format: "number" },
+    { key: "Click", format: "number" }, { key: "CTR" }, { key: "CPC", format: "currency" },
+    { key: "CVR" }, { key: "구매 수", format: "number" }, { key: "구매당 비용", format: "currency" },
+    { key: "광고 성과" }, { key: "콘텐츠 유형" }
+  ];
+  // 서버가 currency_format 을 보내지 않으면 원화 형식 사용
+  const DEFAULT_CURRENCY_FORMAT = { symbol: "₩", decimals: 0, prefix: false };
+  const PERFORMANCE_CLASSES = {
+    "위닝 콘텐츠": "winning-content",
+    "고성과 콘텐츠": "medium-performance",
+    "성과 콘텐츠": "third-performance",
+    "개선 필요!": "needs-improvement"
+  };
+
+  function formatCell(value, format, currencyFormat) {
+    if (!format) return value == null ? "" : String(value);
+    const num = Number(value);
+    if (format !== "currency") {
+      return Number.isFinite(num) ? Math.trunc(num).toLocaleString("en-US") : "0";
+    }
+    const decimals = currencyFormat.decimals;
+    const amount = Number.isFinite(num) ? num : 0;
+    const text = decimals
+      ? amount.toLocaleString("en-US", { minimumFractionDigits: decimals, maximumFractionDigits: decimals })
+      : Math.trunc(amount).toLocaleString("en-US");
+    return currencyFormat.prefix ? `${currencyFormat.symbol}${text}` : `${text} ${currencyFormat.symbol}`;
+  }
+
+  function renderReportTable(records, currencyFormat) {
+    currencyFormat = currencyFormat || DEFAULT_CURRENCY_FORMAT;
+    const table = document.createElement("table");
+    const headerRow = table.insertRow();
+    REPORT_COLUMNS.map(col => col.key).concat(["광고 콘텐츠"]).forEach(label => {
+      const th = document.createElement("th");
+      th.textContent = label;
+      headerRow.appendChild(th);
+    });
+
+    records.forEach(record => {
+      const isTotal = record["소재명"] === "합계";
+      const tr = table.insertRow();
+      if (isTotal) tr.className = "total-row";
+      REPORT_COLUMNS.forEach(col => {
+        const td = tr.insertCell();
+        td.textContent = formatCell(record[col.key], col.format, currencyFormat);
+        if (col.key === "광고 성과") td.className = PERFORMANCE_CLASSES[record[col.key]] || "";
+      });
+
+      const contentCell = tr.insertCell();
+      contentCell.className = "ad-content-cell";
+      const displayUrl = record.display_url;
+      const targetUrl = record.target_url;
+      if (displayUrl) {
+        const img = document.createElement("img");
+        img.src = displayUrl;
+        img.className = "ad-content-thumbnail";
+        img.alt = "광고 콘텐츠";
+        if (typeof targetUrl === "string" && targetUrl.startsWith("http")) {
+          const link = document.createElement("a");
+          link.href = targetUrl;
+          link.target = "_blank";
+          link.rel = "noopener noreferrer";
+          link.appendChild(img);
+          contentCell.appendChild(link);
+        } else {
+          contentCell.appendChild(img);
+        }
+      } else if (!isTotal) {
+        contentCell.textContent = "-";
+      }
+    });
+    return table;
+  }
+
   // 비밀번호 입력 시 계정 목록 불러오기
   passwordInput.addEventListener("blur", function() {
     const pw = passwordInput.value.trim();
@@ -40,6 +128,50 @@ document.addEventListener("DOMContentLoaded", function() {
     });
   });
 
+  // 전체 데이터 내보내기 (집계된 광고별 전체 행을 파일로 다운로드)
+  document.querySelectorAll(".export-btn").forEach(button => {
+    button.addEventListener("click", function() {
+      const pw = passwordInput.value.trim();
+      const accountKey = accountSelect.value;
+      const startDate = startDateInput.value;
+      const endDate = endDateInput.value;
+      const format = button.dataset.format;
+
+      if (!pw || !accountKey || !startDate || !endDate) {
+        alert("모든 항목을 입력해 주세요.");
+        return;
+      }
+
+      button.disabled = true;
+      fetch(`/api/export/${format}`, {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({
+          password: pw,
+          selected_account_key: accountKey,
+          start_date: startDate,
+          end_date: endDate
+        })
+      })
+      .then(res => res.ok ? res.blob() : res.json().then(data => Promise.reject(data.error)))
+      .then(blob => {
+        const link = document.createElement("a");
+        link.href = URL.createObjectURL(blob);
+        link.download = `fb_ads_${accountKey}_${startDate}_${endDate}.${format}`;
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+        URL.revokeObjectURL(link.href);
+      })
+      .catch(err => {
+        alert(typeof err === "string" ? err : "내보내기 중 오류가 발생했습니다.");
+      })
+      .finally(() => {
+        button.disabled = false;
+      });
+    });
+  });
+
   // 폼 제출 시 보고서 생성
   reportForm.addEventListener("submit", function(e) {
     e.preventDefault();
@@ -63,7 +195,8 @@ document.addEventListener("DOMContentLoaded", function() {
         password: pw,
         selected_account_key: accountKey,
         start_date: startDate,
-        end_date: endDate
+        end_date: endDate,
+        render: "data"
       })
     })
     .then(res => res.json())
@@ -73,6 +206,8 @@ document.addEventListener("DOMContentLoaded", function() {
         resultDiv.innerHTML = `<div class="error">${data.error}</div>`;
       } else if (data.html_table) {
         resultDiv.innerHTML = data.html_table;
+      } else if (Array.isArray(data.data) && data.data.length) {
+        resultDiv.appendChild(renderReportTable(data.data, data.currency_format));
       } else {
         resultDiv.innerHTML = "<p>결과가 없습니다.</p>";
       }